@@ -9,6 +9,7 @@ example usage:
     >>> transcribe_sentence("quetin i lambë eldaiva")
 """
 
+import functools
 import re
 
 vowels = ['a','e','i','o','u','á','é','í','ó','ú','ä','ë','ï','ö','ü']
@@ -142,6 +143,97 @@ initial_consonant = {
         'r' : '7',
         }
 
+word_pattern = re.compile(r"[^\W_]+")
+
+VOWELS = frozenset(vowels)
+TENGWAR_VOWELS = frozenset(tengwar_vowels)
+COMBINED_VOWEL_VALUES = frozenset(combined_vowels.values())
+
+""" each vowel as (independent, combined); long vowels are never combined """
+VOWEL_TABLE = {
+        v : (independent_vowels[v], combined_vowels.get(v, long_vowels.get(v)))
+        for v in vowels
+        }
+
+""" a vowel gets its own carrier at the start of a word or after a tehta """
+INDEPENDENT_VOWEL_CONTEXT = COMBINED_VOWEL_VALUES | {''}
+
+def build_trie(*tables):
+    """
+    Merge substitution tables into a prefix trie, so that the
+    longest rule at any point of a word is found in one walk.
+    Each node maps a letter to the next node; a node that ends
+    a rule keeps its replacement under the empty string.
+
+    A compiled regex alternation finds the same matches in C, but
+    the vowel and r rules depend on what was written before, so
+    every match still costs a Python callback and ends up slower
+    than walking this trie.
+    """
+    trie = {}
+    for table in tables:
+        for latin, annatar in table.items():
+            node = trie
+            for letter in latin:
+                node = node.setdefault(letter, {})
+            node[''] = annatar
+    return trie
+
+substitution_trie = build_trie(doubles, triples, quads)
+
+@functools.lru_cache(maxsize=4096)
+def transliterate_word(word):
+    """
+    Convert a single lowercase Latin word to the Annatar encoding.
+    Results are cached, since the same words and particles recur
+    throughout any text.
+    """
+    trie = substitution_trie
+    word_length = len(word)
+    annatar = []
+    append = annatar.append
+    last = ''
+    i = 0
+
+    while i < word_length:
+        """ walk the trie for the longest rule starting at i """
+        node = trie
+        match = None
+        j = i
+        while j < word_length and word[j] in node:
+            node = node[word[j]]
+            j += 1
+            if '' in node:
+                match = node['']
+                match_end = j
+
+        if match is None:
+            """ no rule spans letters here, so substitute just one """
+            letter = word[i]
+            if letter in VOWEL_TABLE:
+                independent, combined = VOWEL_TABLE[letter]
+                if last in INDEPENDENT_VOWEL_CONTEXT:
+                    piece = independent
+                else:
+                    piece = combined
+            elif not last and letter in initial_consonant:
+                piece = initial_consonant[letter]
+            elif letter == 'r':
+                if last in TENGWAR_VOWELS and word[i + 1:i + 2] in VOWELS:
+                    piece = '7'
+                else:
+                    piece = '6'
+            else:
+                piece = consonants.get(letter, letter)
+            match_end = i + 1
+        else:
+            piece = match
+        append(piece)
+        last = piece[-1]
+        i = match_end
+
+    return ''.join(annatar)
+
 class LatinText:
     """
     This object can be processed into words, The Latin characters
@@ -159,9 +251,14 @@ class LatinText:
         This is a list of words generated from the submitted string
 
     """
+    __slots__ = ('latin_string', 'words')
+
     def __init__(self,latin_string):
         self.latin_string = latin_string.lower()
-        self.words = re.split("\W+",self.latin_string)
+        self.words = self.latin_string.split()
+        if not ''.join(self.words).isalpha():
+            """ punctuation or digits present, fall back to the regex """
+            self.words = word_pattern.findall(self.latin_string)
 
 class LatinWord:
     """
@@ -172,273 +269,27 @@ class LatinWord:
     ...
     Attributes
     latin_word : str
-        This is the original text of the word; it will be truncated
-        as the annatar word is built
+        This is the original text of the word
     latin_word_length : int
-        This is the length of the Latin word; it will change as the
-        annatar word is being built
+        This is the length of the Latin word
     annatar_word : str
-        This is a word that will be built piece by piece
+        This is the word in Annatar encoding, set by transliterate()
     
     """
+    __slots__ = ('latin_word', 'latin_word_length', 'annatar_word')
+
     def __init__(self,latin_word):
         self.latin_word = latin_word
         self.latin_word_length = len(self.latin_word)
         self.annatar_word = ""
 
     def transliterate(self):
-        first = True
-        word_length = len(self.latin_word)
-
-        while word_length > 3:
-            """ run through all substitutions """
-            if self.quad_check():
-                self.quad_substitute()
-                word_length -= 4
-            if self.triple_check():
-                self.triple_substitute()
-                word_length -= 3
-            elif self.double_check():
-                self.double_substitute()
-                word_length -= 2
-            elif self.initial_vowel_check():
-                self.independent_vowel_substitute()
-                word_length -= 1
-            elif self.initial_h_check():
-                self.initial_h_substitute()
-                word_length -= 1
-            elif self.long_vowel_check():
-                self.long_vowel_substitute()
-                word_length -= 1
-            elif self.preceding_vowel_check():
-                self.independent_vowel_substitute()
-                word_length -= 1
-            elif self.combined_vowel_check():
-                self.combined_vowel_substitute()
-                word_length -= 1
-            elif self.consonant_check():
-                self.consonant_substitute()
-                word_length -= 1
-
-        while word_length > 2:
-            """ run through all substitutions """
-            if self.triple_check():
-                self.triple_substitute()
-                word_length -= 3
-            elif self.double_check():
-                self.double_substitute()
-                word_length -= 2
-            elif self.initial_vowel_check():
-                self.independent_vowel_substitute()
-                word_length -= 1
-            elif self.initial_h_check():
-                self.initial_h_substitute()
-                word_length -= 1
-            elif self.long_vowel_check():
-                self.long_vowel_substitute()
-                word_length -= 1
-            elif self.preceding_vowel_check():
-                self.independent_vowel_substitute()
-                word_length -= 1
-            elif self.combined_vowel_check():
-                self.combined_vowel_substitute()
-                word_length -= 1
-            elif self.consonant_check():
-                self.consonant_substitute()
-                word_length -= 1
-
-        while word_length > 1:
-            """ run double and signle substitutions, modified doubles """
-            if self.double_check():
-                self.double_substitute()
-                word_length -= 2
-            elif self.initial_vowel_check():
-                self.independent_vowel_substitute()
-                word_length -= 1
-            elif self.initial_h_check():
-                self.initial_h_substitute()
-                word_length -= 1
-            elif self.long_vowel_check():
-                self.long_vowel_substitute()
-                word_length -= 1
-            elif self.preceding_vowel_check():
-                self.independent_vowel_substitute()
-                word_length -= 1
-            elif self.combined_vowel_check():
-                self.combined_vowel_substitute()
-                word_length -= 1
-            elif self.consonant_check():
-                self.consonant_substitute()
-                word_length -= 1
-
-        while word_length > 0:
-            """ run individual substitutions """
-            if self.initial_vowel_check():
-                self.independent_vowel_substitute()
-                word_length -= 1
-            elif self.initial_h_check():
-                self.initial_h_substitute()
-                word_length -= 1
-            elif self.long_vowel_check():
-                self.long_vowel_substitute()
-                word_length -= 1
-            elif self.preceding_vowel_check():
-                self.independent_vowel_substitute()
-                word_length -= 1
-            elif self.combined_vowel_check():
-                self.combined_vowel_substitute()
-                word_length -= 1
-            elif self.consonant_check():
-                self.consonant_substitute()
-                word_length -= 1
-
-
-    def quad_check(self):
-        if len(self.latin_word) == 4:
-            if self.latin_word in quads.keys():
-                return True
-        elif self.latin_word[:4] in quads.keys():
-            return True
-        else:
-            return False
-            
-    def triple_check(self):
-        if len(self.latin_word) == 3:
-            if self.latin_word in triples.keys():
-                return True
-        elif self.latin_word[:3] in triples.keys():
-            return True
-        else:
-            return False
-            
-    def double_check(self):
-        if len(self.latin_word) == 2:
-            if self.latin_word in doubles.keys():
-                return True
-        elif self.latin_word[:2] in doubles.keys():
-            if self.latin_word[:2] == 'nw':
-                if len(self.annatar_word) == 0:
-                    return True
-                else:
-                    return False
-            return True
-        else:
-            return False
-
-    def quad_substitute(self):
-        if len(self.latin_word) == 4:
-            self.annatar_word += self.latin_word
-            self.latin_word = ""
-        else:
-            self.annatar_word += quads[self.latin_word[:4]]
-            self.latin_word = self.latin_word[4:]
-
-    def triple_substitute(self):
-        if len(self.latin_word) == 3:
-            self.annatar_word += triples[self.latin_word]
-            self.latin_word = ""
-        else:
-            self.annatar_word += triples[self.latin_word[:3]]
-            self.latin_word = self.latin_word[3:]
-
-    def double_substitute(self):
-        if len(self.latin_word) == 2:
-            self.annatar_word += self.latin_word
-            self.latin_word = ""
-        else:
-            self.annatar_word += doubles[self.latin_word[:2]]
-            self.latin_word = self.latin_word[2:]
-
-    def initial_vowel_check(self):
-        if self.latin_word[0] in vowels and len(self.annatar_word) == 0:
-            return True
-
-    def initial_h_check(self):
-        if self.latin_word[0] in initial_consonant.keys() and len(self.annatar_word) == 0:
-            return True
-
-    def independent_vowel_substitute(self):
-        self.annatar_word += independent_vowels[self.latin_word[0]]
-        if len(self.latin_word) == 1:
-            self.latin_word = ""
-        else:
-            self.latin_word = self.latin_word[1:]
-
-    def initial_h_substitute(self):
-        self.annatar_word += initial_consonant[self.latin_word[0]]
-        if len(self.latin_word) == 1:
-            self.latin_word = ""
-        else:
-            self.latin_word = self.latin_word[1:]
-
-    def preceding_vowel_check(self):
-        if len(self.annatar_word) > 0 and self.latin_word[0] in vowels:
-            if self.annatar_word[-1] in combined_vowels.values():
-                return True
-            else:
-                return False
-
-    def combined_vowel_check(self):
-        if len(self.annatar_word) > 0: 
-            if self.latin_word[0] in vowels:
-                return True
-
-    def combined_vowel_substitute(self):
-        self.annatar_word += combined_vowels[self.latin_word[0]]
-        if len(self.latin_word) == 1:
-            self.latin_word = ""
-        else:
-            self.latin_word = self.latin_word[1:]
-
-    def consonant_check(self):
-        if self.latin_word[0] in consonants.keys():
-            return True
-
-    def consonant_substitute(self):
-        if self.latin_word[0] == 'r':
-            if len(self.latin_word) > 1:
-                if self.annatar_word[-1] in tengwar_vowels and self.latin_word[1] in vowels:
-                    self.annatar_word += '7'
-                    self.latin_word = self.latin_word[1:]
-                else:
-                    self.annatar_word += '6'
-                    self.latin_word = self.latin_word[1:]
-            else:
-                self.annatar_word += '6'
-                self.latin_word = ''
-        else:
-            self.annatar_word += consonants[self.latin_word[0]]
-            if len(self.latin_word) == 1:
-                self.latin_word = ""
-            else:
-                self.latin_word = self.latin_word[1:]
-
-    def long_vowel_check(self):
-        if self.latin_word[0] in long_vowels.keys():
-            return True
-
-    def long_vowel_substitute(self):
-        self.annatar_word += long_vowels[self.latin_word[0]]
-        if len(self.latin_word) == 1:
-            self.latin_word = ""
-        else:
-            self.latin_word = self.latin_word[1:]
+        self.annatar_word = transliterate_word(self.latin_word)
 
 def transcribe_sentence(sentence):
     latin_sentence = LatinText(sentence)
 
-    words = [w for w in latin_sentence.words]
-
-    quenya_words = []
-
-    for word in words:
-        tengwar_word = LatinWord(word)
-        tengwar_word.transliterate()
-        quenya_words.append(tengwar_word.annatar_word)
-
-    new_sentence = ' '.join(quenya_words)
-
-    return new_sentence
+    return ' '.join(map(transliterate_word, latin_sentence.words))
 
 
 if __name__ == "__main__":